@@ -11,70 +11,108 @@ This script replicates the n8n workflow functionality:
 """
 
 import os
+import re
 import json
+import heapq
+import asyncio
+import argparse
 import logging
-import random
-from datetime import datetime
 from typing import List, Dict, Optional
-import requests
+import aiohttp
+import orjson
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('twitter_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+from bot_common import LOG_FILE, TWEET_MAX_TOKENS, ContentBot, fit_tweet, setup_logging
+from rate_limiter import DEFAULT_RPM, DEFAULT_TPM, RateLimiter
+from response_cache import BatchQueue
+
+setup_logging()
 logger = logging.getLogger(__name__)
 
-class TwitterContentBot:
-    def __init__(self):
-        """Initialize the Twitter content bot with API credentials."""
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.twitter_bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
+# Matches the "N. tweet text" line that starts each post of a batched completion
+NUMBERED_LINE = re.compile(r'^[ \t]*(\d+)[.)][ \t]*(.*?)[ \t]*$')
+
+def split_numbered(content: str) -> Dict[int, str]:
+    """
+    Split a numbered reply into posts keyed by their number.
+    Unnumbered lines, such as hashtags on a line of their own, continue the
+    post above them; anything before the first number is ignored.
+    """
+    posts = {}
+    number = None
+    for line in content.splitlines():
+        match = NUMBERED_LINE.match(line)
+        if match:
+            number = int(match.group(1))
+            posts[number] = match.group(2)
+        elif number is not None and line.strip():
+            posts[number] = f"{posts[number]}\n{line.strip()}".lstrip()
+    return posts
+
+class TwitterContentBot(ContentBot):
+    __slots__ = ('twitter_bearer_token',)
+    
+    def __init__(self, use_cache: bool = True, force_cache: bool = False,
+                 weights: Optional[List[float]] = None, seed: Optional[int] = None):
+        """
+        Initialize the Twitter content bot with API credentials.
         
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
+        Args:
+            use_cache: If True, serve repeated prompts from the local response cache.
+            force_cache: If True, cache responses even at high sampling temperatures.
+            weights: Optional selection weight for each content idea (uniform by default).
+            seed: Optional seed for reproducible idea selection.
+        """
+        self.twitter_bearer_token = os.getenv('TWITTER_BEARER_TOKEN')
         if not self.twitter_bearer_token:
             raise ValueError("TWITTER_BEARER_TOKEN environment variable is required")
         
-        # Content ideas pool (replaces Google Sheets functionality)
-        self.content_ideas = [
-            {"Platform": "Twitter", "Idea": "Latest trends in artificial intelligence and machine learning"},
-            {"Platform": "Twitter", "Idea": "Tips for productivity and time management"},
-            {"Platform": "Twitter", "Idea": "Interesting facts about technology and innovation"},
-            {"Platform": "Twitter", "Idea": "Motivational quotes for entrepreneurs and creators"},
-            {"Platform": "Twitter", "Idea": "Behind-the-scenes insights from the tech industry"},
-            {"Platform": "Twitter", "Idea": "Quick tutorials on programming and development"},
-            {"Platform": "Twitter", "Idea": "Industry news and analysis"},
-            {"Platform": "Twitter", "Idea": "Personal growth and learning strategies"},
-            {"Platform": "Twitter", "Idea": "Future predictions for technology"},
-            {"Platform": "Twitter", "Idea": "Success stories and case studies"}
-        ]
+        super().__init__(use_cache, force_cache, weights, seed)
     
-    def get_content_idea(self) -> Dict[str, str]:
+    def _sample_ideas(self, k: int) -> List[Dict[str, str]]:
         """
-        Get a random content idea (replaces Google Sheets node).
-        Returns a dictionary with Platform and Idea keys.
+        Pick up to k distinct content ideas, honouring the selection weights.
+        Each idea draws the key u ** (1 / weight) and the k largest keys win
+        (Efraimidis-Spirakis weighted sampling without replacement).
         """
-        idea = random.choice(self.content_ideas)
-        logger.info(f"Selected content idea: {idea['Idea']}")
-        return idea
+        keyed = [
+            (self._rng.random() ** (1 / weight), i)
+            for i, weight in enumerate(self._weights) if weight > 0
+        ]
+        return [self.content_ideas[i] for _, i in heapq.nlargest(k, keyed)]
     
-    def generate_post_with_openai(self, content_idea: Dict[str, str]) -> Optional[str]:
-        """
-        Generate a social media post using OpenAI (replicates OpenAI node).
-        Uses the same prompt template as the n8n workflow.
-        """
+    def _build_request(self, content_idea: Dict[str, str]) -> Dict:
+        """Build the chat completions request body for a content idea."""
         # Original n8n prompt template
         prompt = f"Create a social media post for {content_idea['Platform']} based on this idea: {content_idea['Idea']}. Keep it engaging and concise."
         
-        headers = {
-            'Authorization': f'Bearer {self.openai_api_key}',
-            'Content-Type': 'application/json'
+        return {
+            'model': 'gpt-4',
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': prompt
+                }
+            ],
+            'max_tokens': TWEET_MAX_TOKENS,
+            'temperature': 0.7
         }
+    
+    async def generate_posts_with_openai(self, ideas: List[Dict[str, str]]) -> List[str]:
+        """
+        Generate one post per idea with a single OpenAI request.
+        The ideas are sent as a numbered list and the numbered reply is split
+        back into tweets, so k tweets cost one round-trip instead of k.
+        Returns an empty list if the reply cannot be matched to the ideas.
+        """
+        numbered_ideas = "\n".join(
+            f"{i}. For {idea['Platform']}: {idea['Idea']}"
+            for i, idea in enumerate(ideas, start=1)
+        )
+        prompt = (
+            f"Create {len(ideas)} social media posts, one for each numbered idea below. "
+            f"Keep each post engaging and concise. Reply with exactly {len(ideas)} lines "
+            f"numbered 1 to {len(ideas)}, one post per line.\n{numbered_ideas}"
+        )
         
         data = {
             'model': 'gpt-4',
@@ -84,44 +122,166 @@ class TwitterContentBot:
                     'content': prompt
                 }
             ],
-            'max_tokens': 280,  # Twitter character limit
+            'max_tokens': TWEET_MAX_TOKENS * len(ideas),
             'temperature': 0.7
         }
         
         try:
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers=headers,
-                json=data,
-                timeout=30
+            result = await self._openai.request_json(
+                'POST', 'https://api.openai.com/v1/chat/completions', json=data
             )
-            response.raise_for_status()
             
-            result = response.json()
-            generated_text = result['choices'][0]['message']['content'].strip()
+            content = result['choices'][0]['message']['content']
             
-            # Ensure tweet is within Twitter's character limit
-            if len(generated_text) > 280:
-                generated_text = generated_text[:277] + "..."
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"OpenAI API request failed: {e}")
+            return []
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"Error parsing OpenAI response: {e}")
+            return []
+        
+        posts = split_numbered(content)
+        if sorted(posts) != list(range(1, len(ideas) + 1)) or not all(posts.values()):
+            logger.error(f"Expected {len(ideas)} numbered posts, got {len(posts)}")
+            return []
+        
+        tweets = [fit_tweet(text) for _, text in sorted(posts.items())]
+        logger.info(f"Generated {len(tweets)} tweets in one request")
+        return tweets
+    
+    async def _one(self, content_idea: Dict[str, str], semaphore: asyncio.Semaphore,
+                   limiter: RateLimiter) -> Optional[str]:
+        """Generate a single tweet within the concurrency and rate limits."""
+        data = self._build_request(content_idea)
+        # Rough prompt size (~4 characters per token) plus the completion budget
+        tokens = len(json.dumps(data['messages'])) // 4 + data['max_tokens']
+        
+        async with semaphore:
+            await limiter.acquire(tokens)
+            try:
+                result = await self._openai.request_json(
+                    'POST', 'https://api.openai.com/v1/chat/completions', json=data
+                )
+                choice = result['choices'][0]
+                generated_text = (choice['message']['content'] or '').strip()
+                if not generated_text:
+                    logger.error("OpenAI returned an empty tweet")
+                    return None
+                return fit_tweet(generated_text, choice.get('finish_reason') == 'length')
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"OpenAI API request failed: {e}")
+                return None
+            except (KeyError, IndexError, ValueError) as e:
+                logger.error(f"Error parsing OpenAI response: {e}")
+                return None
+    
+    async def generate_many(self, ideas: List[Dict[str, str]], concurrency: int = 5,
+                            rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM) -> List[Optional[str]]:
+        """
+        Generate one tweet per idea with concurrent OpenAI requests.
+        At most `concurrency` requests are in flight, and the request and
+        token rates stay under `rpm` and `tpm`. Failed ideas yield None.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        limiter = RateLimiter(rpm, tpm)
+        return await asyncio.gather(*(self._one(idea, semaphore, limiter) for idea in ideas))
+    
+    async def submit_batch(self, ideas: List[Dict[str, str]]) -> Optional[str]:
+        """
+        Submit one chat completion per idea to the OpenAI Batch API.
+        Batch requests are billed at half price and complete within 24 hours.
+        Returns the batch id, or None if the submission failed.
+        """
+        lines = [
+            orjson.dumps({
+                'custom_id': str(i),
+                'method': 'POST',
+                'url': '/v1/chat/completions',
+                'body': self._build_request(idea)
+            })
+            for i, idea in enumerate(ideas)
+        ]
+        
+        try:
+            input_file = await self._openai.upload_file(b"\n".join(lines), 'batch.jsonl', 'batch')
+            input_file_id = input_file['id']
             
-            logger.info(f"Generated tweet: {generated_text}")
-            return generated_text
+            batch = await self._openai.request_json(
+                'POST', 'https://api.openai.com/v1/batches',
+                json={
+                    'input_file_id': input_file_id,
+                    'endpoint': '/v1/chat/completions',
+                    'completion_window': '24h'
+                }
+            )
+            batch_id = batch['id']
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"OpenAI API request failed: {e}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"OpenAI batch submission failed: {e}")
             return None
-        except (KeyError, IndexError) as e:
+        except (KeyError, ValueError) as e:
             logger.error(f"Error parsing OpenAI response: {e}")
             return None
+        
+        logger.info(f"Submitted batch {batch_id} with {len(ideas)} requests")
+        return batch_id
     
-    def check_platform(self, content_idea: Dict[str, str]) -> bool:
+    async def collect_batch(self, batch_id: str) -> Optional[Dict[int, str]]:
         """
-        Check if the platform is Twitter (replicates IF node).
-        Returns True if platform equals "Twitter".
+        Check a batch once and download its results if it has finished.
+        Returns None while the batch is still running. Otherwise returns the
+        generated tweets keyed by the index of their idea; requests that
+        failed inside the batch, and unreadable output lines, are left out.
+        Expired and cancelled batches keep whatever requests completed.
         """
-        is_twitter = content_idea.get('Platform', '').lower() == 'twitter'
-        logger.info(f"Platform check - Is Twitter: {is_twitter}")
-        return is_twitter
+        try:
+            batch = await self._openai.request_json(
+                'GET', f'https://api.openai.com/v1/batches/{batch_id}'
+            )
+            
+            if batch['status'] not in ('completed', 'failed', 'expired', 'cancelled'):
+                logger.info(f"Batch {batch_id} is {batch['status']}")
+                return None
+            if batch['status'] != 'completed':
+                logger.error(f"Batch {batch_id} ended with status {batch['status']}")
+            
+            if not batch.get('output_file_id'):
+                logger.error(f"Batch {batch_id} finished without any output")
+                return {}
+            
+            output = await self._openai.download_file(batch['output_file_id'])
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"OpenAI batch request failed: {e}")
+            return None
+        except (KeyError, ValueError) as e:
+            logger.error(f"Error parsing OpenAI response: {e}")
+            return None
+        
+        tweets = {}
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = orjson.loads(line)
+                index = int(record['custom_id'])
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Skipping unreadable line in batch {batch_id} output: {e}")
+                continue
+            try:
+                choice = record['response']['body']['choices'][0]
+                text = (choice['message']['content'] or '').strip()
+            except (KeyError, IndexError, TypeError):
+                logger.error(f"Batch request {index} failed: {record.get('error')}")
+                continue
+            if not text:
+                logger.error(f"Batch request {index} returned an empty tweet")
+                continue
+            tweets[index] = fit_tweet(text, choice.get('finish_reason') == 'length')
+        
+        logger.info(f"Collected {len(tweets)} tweets from batch {batch_id}")
+        return tweets
     
     def post_to_twitter(self, tweet_text: str) -> bool:
         """
@@ -141,38 +301,29 @@ class TwitterContentBot:
             logger.error(f"Failed to post tweet: {e}")
             return False
     
-    def update_log(self, tweet_text: str):
+    def update_log(self, tweet_text: str, status: str = "Posted"):
         """
         Update activity log (replaces Google Sheets update node).
         Logs the posted tweet with timestamp.
         """
         log_entry = {
-            "status": "Posted",
+            "status": status,
             "text": tweet_text,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._clock.now(),
             "platform": "Twitter"
         }
         
-        # Append to JSON log file
-        log_file = 'posted_tweets.json'
+        # Append one JSON line; earlier entries are never re-read or rewritten
         try:
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-            
-            logs.append(log_entry)
-            
-            with open(log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
+            with open(LOG_FILE, 'ab') as f:
+                f.write(orjson.dumps(log_entry) + b'\n')
             
             logger.info(f"Updated log with new tweet entry")
             
         except Exception as e:
             logger.error(f"Failed to update log: {e}")
     
-    def run_workflow(self):
+    async def run_workflow(self):
         """
         Execute the complete workflow (replicates the n8n workflow flow).
         """
@@ -183,7 +334,7 @@ class TwitterContentBot:
             content_idea = self.get_content_idea()
             
             # Step 2: Generate Post with OpenAI
-            tweet_text = self.generate_post_with_openai(content_idea)
+            tweet_text = await self.generate_post_with_openai(content_idea)
             if not tweet_text:
                 logger.error("Failed to generate tweet text")
                 return False
@@ -193,11 +344,17 @@ class TwitterContentBot:
                 logger.info("Platform is not Twitter, skipping post")
                 return False
             
+            # A re-run on the same day must not post the tweet twice
+            if self.already_posted(content_idea):
+                logger.info("Today's tweet for this idea was already posted, skipping post")
+                return True
+            
             # Step 4: Post to Twitter
             success = self.post_to_twitter(tweet_text)
             if not success:
                 logger.error("Failed to post tweet")
                 return False
+            self.mark_posted(content_idea, tweet_text)
             
             logger.info("Workflow completed successfully!")
             return True
@@ -205,12 +362,175 @@ class TwitterContentBot:
         except Exception as e:
             logger.error(f"Workflow failed with error: {e}")
             return False
+    
+    async def schedule_week(self, days: int = 7) -> bool:
+        """
+        Generate a week's worth of tweets with a single OpenAI request.
+        The tweets are queued in the local cache and logged as "Scheduled";
+        each --batch-collect run then posts the oldest one.
+        """
+        logger.info(f"Generating tweets for the next {days} days...")
+        
+        ideas = self._sample_ideas(days)
+        tweets = await self.generate_posts_with_openai(ideas)
+        if not tweets:
+            logger.error("Failed to generate tweets for the week")
+            return False
+        
+        scheduled = []
+        for idea, tweet_text in zip(ideas, tweets):
+            if not self.check_platform(idea):
+                logger.info("Platform is not Twitter, skipping post")
+                continue
+            self.update_log(tweet_text, "Scheduled")
+            scheduled.append(tweet_text)
+        
+        queue = BatchQueue()
+        try:
+            queue.schedule(scheduled)
+        finally:
+            queue.close()
+        
+        logger.info(f"Scheduled {len(scheduled)} tweets")
+        return True
+
+    async def run_batch_submit(self, count: int = 7) -> bool:
+        """
+        Submit a batch of tweets to the Batch API and queue its id in the
+        local cache, so a later --batch-collect run can pick up the results
+        without waiting up to 24 hours here.
+        """
+        logger.info(f"Submitting a batch of {count} tweets...")
+        
+        ideas = self._sample_ideas(count)
+        batch_id = await self.submit_batch(ideas)
+        if not batch_id:
+            return False
+        
+        queue = BatchQueue()
+        try:
+            queue.add_batch(batch_id, ideas)
+        finally:
+            queue.close()
+        
+        logger.info(f"Queued batch {batch_id}; collect it with --batch-collect")
+        return True
+    
+    async def run_batch_collect(self) -> bool:
+        """
+        Collect any finished batches into the scheduled tweet queue, then
+        post the oldest scheduled tweet. Falls back to run_workflow() when
+        nothing is queued yet, so a daily run always posts.
+        """
+        logger.info("Collecting finished batches...")
+        
+        queue = BatchQueue()
+        try:
+            for batch_id, ideas in queue.pending_batches():
+                tweets = await self.collect_batch(batch_id)
+                if tweets is None:
+                    continue
+                
+                scheduled = []
+                for i, tweet_text in sorted(tweets.items()):
+                    if i >= len(ideas) or not self.check_platform(ideas[i]):
+                        logger.info("Platform is not Twitter, skipping post")
+                        continue
+                    self.update_log(tweet_text, "Scheduled")
+                    scheduled.append(tweet_text)
+                queue.finish_batch(batch_id, scheduled)
+                logger.info(f"Scheduled {len(scheduled)} tweets from batch {batch_id}")
+            
+            next_tweet = queue.next_scheduled()
+            if next_tweet is None:
+                logger.info("No scheduled tweets yet, generating one now")
+                return await self.run_workflow()
+            
+            row_id, tweet_text = next_tweet
+            if not self.post_to_twitter(tweet_text):
+                logger.error("Failed to post tweet")
+                return False
+            queue.remove_scheduled(row_id)
+        finally:
+            queue.close()
+        
+        logger.info("Posted the next scheduled tweet")
+        return True
+    
+    async def run_parallel_workflow(self, count: int, concurrency: int = 5,
+                                    rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM) -> bool:
+        """
+        Generate tweets with concurrent requests and queue them like schedule_week(),
+        for --batch-collect runs to post one at a time.
+        """
+        logger.info(f"Generating {count} tweets with up to {concurrency} concurrent requests...")
+        
+        ideas = self._sample_ideas(count)
+        tweets = await self.generate_many(ideas, concurrency, rpm, tpm)
+        
+        scheduled = []
+        for idea, tweet_text in zip(ideas, tweets):
+            if not tweet_text:
+                continue
+            if not self.check_platform(idea):
+                logger.info("Platform is not Twitter, skipping post")
+                continue
+            self.update_log(tweet_text, "Scheduled")
+            scheduled.append(tweet_text)
+        
+        queue = BatchQueue()
+        try:
+            queue.schedule(scheduled)
+        finally:
+            queue.close()
+        
+        logger.info(f"Scheduled {len(scheduled)} of {len(ideas)} tweets")
+        return bool(scheduled)
+
+async def run_bot(bot: TwitterContentBot, args: argparse.Namespace) -> bool:
+    """Run the selected workflow and release the bot's HTTP session afterwards."""
+    async with bot:
+        if args.parallel:
+            return await bot.run_parallel_workflow(
+                args.parallel, args.concurrency, args.rpm, args.tpm
+            )
+        if args.batch_submit:
+            return await bot.run_batch_submit()
+        if args.batch_collect:
+            return await bot.run_batch_collect()
+        if args.week:
+            return await bot.schedule_week()
+        return await bot.run_workflow()
+
+def parse_args():
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Automated Twitter content creator")
+    parser.add_argument('--week', action='store_true',
+                        help="generate a week of tweets in one OpenAI request")
+    parser.add_argument('--batch-submit', action='store_true',
+                        help="submit a week of tweets to the OpenAI Batch API")
+    parser.add_argument('--batch-collect', action='store_true',
+                        help="collect finished batches and post the next scheduled tweet")
+    parser.add_argument('--parallel', type=int, metavar='K',
+                        help="generate K tweets with concurrent OpenAI requests")
+    parser.add_argument('--concurrency', type=int, default=5,
+                        help="maximum concurrent requests for --parallel (default: 5)")
+    parser.add_argument('--rpm', type=int, default=DEFAULT_RPM,
+                        help=f"requests per minute limit for --parallel (default: {DEFAULT_RPM})")
+    parser.add_argument('--tpm', type=int, default=DEFAULT_TPM,
+                        help=f"tokens per minute limit for --parallel (default: {DEFAULT_TPM})")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="skip the exact-match response cache (not the semantic cache or daily memo)")
+    parser.add_argument('--force-cache', action='store_true',
+                        help="cache responses even at high sampling temperatures")
+    return parser.parse_args()
 
 def main():
     """Main function to run the Twitter content bot."""
+    args = parse_args()
     try:
-        bot = TwitterContentBot()
-        success = bot.run_workflow()
+        bot = TwitterContentBot(use_cache=not args.no_cache, force_cache=args.force_cache)
+        success = asyncio.run(run_bot(bot, args))
         
         if success:
             print("✅ Twitter content creation completed successfully!")
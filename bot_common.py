@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Shared runtime for the Twitter bots.
+Holds the queued logging setup, the JSON Lines tweet log and its timestamps,
+tweet length handling, the OpenAI HTTP client (keep-alive pool, warm-up,
+retries and streaming) and ContentBot, the idea selection and cached tweet
+generation both bots build on, so they share one implementation.
+"""
+
+import asyncio
+import atexit
+import functools
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import orjson
+
+from response_cache import CACHE_MAX_TEMPERATURE, DailyMemo, ResponseCache
+from semantic_cache import semantic_cache_from_env
+
+logger = logging.getLogger(__name__)
+
+_log_listener = None
+
+def setup_logging(log_file: str = 'twitter_bot.log'):
+    """
+    Send log records to the file and console through a queue.
+    A background listener thread does the writing, so logging never blocks
+    the workflow on I/O. Calling this more than once has no effect.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    log_handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+    for handler in log_handlers:
+        handler.setFormatter(log_formatter)
+
+    log_queue = queue.Queue(-1)
+    _log_listener = logging.handlers.QueueListener(log_queue, *log_handlers, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+# Tweet history, one JSON object per line
+LOG_FILE = 'posted_tweets.jsonl'
+
+def read_log(log_file: str = LOG_FILE) -> List[Dict]:
+    """Load every entry from the JSON Lines tweet log."""
+    with open(log_file, 'rb') as f:
+        return [orjson.loads(line) for line in f]
+
+def sync_log(log_file: str = LOG_FILE):
+    """Flush the tweet log to disk once, rather than on every append."""
+    if not os.path.exists(log_file):
+        return
+    try:
+        with open(log_file, 'a') as f:
+            os.fsync(f.fileno())
+    except OSError as e:
+        logger.error(f"Failed to sync log: {e}")
+
+class LogClock:
+    __slots__ = ('_prefix', '_minute_start')
+
+    def __init__(self):
+        """
+        UTC ISO-8601 timestamps for log entries.
+        The date-to-minute prefix is formatted at most once a minute and the
+        seconds come from the monotonic clock, so batch logging stays cheap.
+        """
+        self._prefix = ''
+        self._minute_start = float('-inf')
+
+    def now(self) -> str:
+        """Return the current time, e.g. 2026-10-15T06:08:15.577178Z."""
+        seconds = time.monotonic() - self._minute_start
+        if seconds >= 60:
+            wall = time.time()
+            minute = wall - wall % 60
+            self._prefix = time.strftime('%Y-%m-%dT%H:%M:', time.gmtime(minute))
+            self._minute_start = time.monotonic() - (wall - minute)
+            seconds = wall - minute
+        # Keep the last microsecond of a minute from rounding up to 60.000000
+        seconds = min(seconds, 59.999999)
+        return f"{self._prefix}{seconds:09.6f}Z"
+
+# Twitter's character limit, and a completion budget that fits it
+# (~4 characters per token) so the model rarely needs truncating
+TWEET_LIMIT = 280
+TWEET_MAX_TOKENS = 80
+
+def fit_tweet(text: str, truncated: bool = False) -> str:
+    """
+    Trim text to Twitter's limit, ending it with a single ellipsis character.
+    Text that was already cut short (a stopped stream or a completion that
+    ran out of tokens) always gets the ellipsis, even when it fits.
+    """
+    if len(text) <= TWEET_LIMIT and not truncated:
+        return text
+    return text[:TWEET_LIMIT - 1].rstrip() + "…"
+
+# OpenAI responses retried by OpenAIClient, and how often
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled on every attempt
+
+class CompletionError(Exception):
+    """OpenAI finished a completion without usable text."""
+
+def retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    """Seconds to wait before retrying, from Retry-After or exponential backoff."""
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return RETRY_BACKOFF * 2 ** attempt
+
+class OpenAIClient:
+    __slots__ = ('api_key', '_connector', '_session', '_warm_up')
+
+    def __init__(self, api_key: str):
+        """Keep-alive connection pool for OpenAI calls, shared by every call of a bot."""
+        self.api_key = api_key
+        # aiohttp needs a running event loop, so the session is created on first use
+        self._connector = None
+        self._session = None
+        self._warm_up = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """The shared session, created on first use."""
+        if self._session is None or self._session.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=20, limit_per_host=10, keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(
+                connector=self._connector,
+                # Content-Type is set per request (JSON bodies, multipart uploads)
+                headers={'Authorization': f'Bearer {self.api_key}'},
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._session
+
+    def start_warm_up(self):
+        """Open the connection to OpenAI in the background (needs a running loop)."""
+        self._warm_up = asyncio.create_task(self._warm_connection())
+
+    async def _warm_connection(self):
+        """Complete the TCP/TLS handshake early and check the API key on the way."""
+        try:
+            async with self.session.get('https://api.openai.com/v1/models') as response:
+                if response.status == 401:
+                    logger.error("OpenAI rejected the API key")
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Could not warm up the OpenAI connection: {e}")
+
+    async def wait_for_warm_up(self):
+        """Let the warm-up request finish so the next call reuses its connection."""
+        if self._warm_up is not None:
+            await self._warm_up
+            self._warm_up = None
+
+    async def close(self):
+        """Cancel any pending warm-up and close the session."""
+        if self._warm_up is not None:
+            self._warm_up.cancel()
+            self._warm_up = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._connector = None
+
+    async def request_json(self, method: str, url: str, **kwargs) -> Dict:
+        """
+        Send an OpenAI API request and return the decoded JSON body.
+        Rate limits and transient server errors are retried with exponential
+        backoff, honouring Retry-After when OpenAI sends it.
+        """
+        await self.wait_for_warm_up()
+        for attempt in range(MAX_RETRIES + 1):
+            async with self.session.request(method, url, **kwargs) as response:
+                if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    return orjson.loads(await response.read())
+                delay = retry_delay(response, attempt)
+            logger.warning(f"OpenAI returned {response.status}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def stream_completion(self, data: Dict, limit: int = TWEET_LIMIT) -> Tuple[str, bool]:
+        """
+        Stream a chat completion and return the text received, and whether it
+        was cut short. The stream is abandoned once more than `limit`
+        characters have arrived, so the model stops generating tokens that
+        would be truncated anyway.
+        Raises CompletionError if the stream reports an error, is filtered,
+        or ends without any text.
+        """
+        await self.wait_for_warm_up()
+        data = {**data, 'stream': True}
+        for attempt in range(MAX_RETRIES + 1):
+            async with self.session.post(
+                'https://api.openai.com/v1/chat/completions', json=data
+            ) as response:
+                if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    response.raise_for_status()
+                    text = ''
+                    finish_reason = None
+                    truncated = False
+                    async for raw_line in response.content:
+                        line = raw_line.decode().strip()
+                        if not line.startswith('data: '):
+                            continue
+                        payload = line[len('data: '):]
+                        if payload == '[DONE]':
+                            break
+                        chunk = orjson.loads(payload)
+                        if chunk.get('error'):
+                            raise CompletionError(f"OpenAI stream error: {chunk['error']}")
+                        choices = chunk.get('choices')
+                        if not choices:
+                            continue
+                        delta = choices[0]['delta'].get('content')
+                        finish_reason = choices[0].get('finish_reason') or finish_reason
+                        if delta:
+                            text += delta
+                            logger.debug("Partial tweet: %s", text)
+                        if len(text) > limit:
+                            # Drop the connection instead of reading the rest
+                            response.close()
+                            truncated = True
+                            break
+                    if finish_reason == 'content_filter':
+                        raise CompletionError("OpenAI filtered the completion")
+                    if not text.strip():
+                        raise CompletionError("OpenAI returned an empty completion")
+                    return text, truncated or finish_reason == 'length'
+                delay = retry_delay(response, attempt)
+            logger.warning(f"OpenAI returned {response.status}, retrying in {delay}s")
+            await asyncio.sleep(delay)
+
+    async def upload_file(self, content: bytes, filename: str, purpose: str) -> Dict:
+        """Upload a file to OpenAI and return the file object."""
+        await self.wait_for_warm_up()
+        form = aiohttp.FormData()
+        form.add_field('purpose', purpose)
+        form.add_field('file', content, filename=filename, content_type='application/jsonl')
+        async with self.session.post('https://api.openai.com/v1/files', data=form) as response:
+            response.raise_for_status()
+            return orjson.loads(await response.read())
+
+    async def download_file(self, file_id: str) -> bytes:
+        """Return the content of an OpenAI file."""
+        await self.wait_for_warm_up()
+        async with self.session.get(
+            f'https://api.openai.com/v1/files/{file_id}/content'
+        ) as response:
+            response.raise_for_status()
+            return await response.read()
+
+# Shared content ideas pools, kept next to the bots
+IDEAS_FILE = Path(__file__).with_name('content_ideas.json')
+
+class ContentBot:
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ('openai_api_key', 'content_ideas', '_weights', '_cum', '_rng', '_daily_memo',
+                 '_openai', '_cache', '_force_cache', '_semantic_cache', '_clock')
+    
+    # Lowercased platform names the workflow posts to
+    _ALLOWED_PLATFORMS = frozenset({'twitter'})
+    
+    # Pool of content_ideas.json the bot draws from
+    _IDEAS_POOL = 'basic'
+    
+    @classmethod
+    @functools.cache
+    def _load_ideas(cls) -> List[Dict[str, str]]:
+        """Load the bot's ideas pool from content_ideas.json, once per process."""
+        ideas = orjson.loads(IDEAS_FILE.read_bytes())[cls._IDEAS_POOL]
+        # Lowercase each platform once here instead of on every check
+        for idea in ideas:
+            idea['_platform_lc'] = idea['Platform'].lower()
+        return ideas
+    
+    def __init__(self, use_cache: bool = True, force_cache: bool = False,
+                 weights: Optional[List[float]] = None, seed: Optional[int] = None):
+        """
+        Set up the OpenAI client, idea selection and caches shared by the bots.
+        
+        Args:
+            use_cache: If True, serve repeated prompts from the local response cache.
+            force_cache: If True, cache responses even at high sampling temperatures.
+            weights: Optional selection weight for each content idea (uniform by default).
+            seed: Optional seed for reproducible idea selection.
+        """
+        self.openai_api_key = os.getenv('OPENAI_API_KEY')
+        
+        if not self.openai_api_key:
+            raise ValueError("OPENAI_API_KEY environment variable is required")
+        
+        # Content ideas pool (replaces Google Sheets functionality)
+        self.content_ideas = self._load_ideas()
+        
+        # Cumulative selection weights, built once so each pick is a single bisect
+        weights = weights or [1] * len(self.content_ideas)
+        if len(weights) != len(self.content_ideas):
+            raise ValueError("weights must have one entry per content idea")
+        self._weights = weights
+        self._cum = list(itertools.accumulate(weights))
+        
+        # Optional replay of the same idea and tweet within a UTC day, so a
+        # retried scheduled run does not pay OpenAI twice
+        self._daily_memo = None
+        if os.getenv('MEMOIZE_BY_DAY') == '1':
+            self._daily_memo = DailyMemo()
+            logger.warning("MEMOIZE_BY_DAY is set: tweets are replayed for the rest of the "
+                           "UTC day, suppressing sampling variance")
+            if seed is None:
+                seed = datetime.now(timezone.utc).date().toordinal()
+        self._rng = random.Random(seed)
+        
+        # Log timestamps, with the minute prefix cached between entries
+        self._clock = LogClock()
+        
+        # Shared keep-alive connection pool for OpenAI calls
+        self._openai = OpenAIClient(self.openai_api_key)
+        
+        self._cache = ResponseCache() if use_cache else None
+        self._force_cache = force_cache
+        
+        # Optional similarity-based reuse of tweets for related ideas
+        self._semantic_cache = semantic_cache_from_env()
+        if self._semantic_cache is not None:
+            self._semantic_cache.precompute([idea['Idea'] for idea in self.content_ideas])
+    
+    async def close(self):
+        """Close the HTTP session and response cache, and sync the tweet log."""
+        await self._openai.close()
+        sync_log()
+        if self._cache is not None:
+            self._cache.close()
+            self._cache = None
+        if self._daily_memo is not None:
+            self._daily_memo.close()
+            self._daily_memo = None
+    
+    async def __aenter__(self):
+        # Open the connection to OpenAI while the workflow picks its ideas
+        self._openai.start_warm_up()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    def get_content_idea(self) -> Dict[str, str]:
+        """
+        Get a random content idea (replaces Google Sheets node).
+        Returns a dictionary with Platform and Idea keys.
+        """
+        idea = self._rng.choices(self.content_ideas, cum_weights=self._cum, k=1)[0]
+        logger.info(f"Selected content idea: {idea['Idea']}")
+        return idea
+    
+    def _build_request(self, content_idea: Dict[str, str]) -> Dict:
+        """Build the chat completions request body for a content idea."""
+        raise NotImplementedError
+    
+    def _memo_key(self, content_idea: Dict[str, str]) -> Tuple[str, str]:
+        """Daily memo key for an idea: its hash and today's UTC date."""
+        return (
+            DailyMemo.idea_hash(content_idea['Idea']),
+            datetime.now(timezone.utc).date().isoformat()
+        )
+    
+    def already_posted(self, content_idea: Dict[str, str]) -> bool:
+        """Return True if MEMOIZE_BY_DAY is set and today's tweet for the idea was posted."""
+        return self._daily_memo is not None and self._daily_memo.is_posted(
+            *self._memo_key(content_idea)
+        )
+    
+    def mark_posted(self, content_idea: Dict[str, str], tweet_text: str):
+        """Remember that today's tweet for the idea was posted, so re-runs skip it."""
+        if self._daily_memo is not None:
+            self._daily_memo.mark_posted(*self._memo_key(content_idea), tweet_text)
+    
+    async def generate_post_with_openai(self, content_idea: Dict[str, str]) -> Optional[str]:
+        """
+        Generate a social media post using OpenAI (replicates OpenAI node).
+        The daily memo, the response cache and the semantic cache are tried
+        first; a fresh completion is stored in each of them.
+        """
+        data = self._build_request(content_idea)
+        
+        memo_key = None
+        if self._daily_memo is not None:
+            memo_key = self._memo_key(content_idea)
+            memoized_text = self._daily_memo.get(*memo_key)
+            if memoized_text:
+                logger.info(f"Using memoized tweet: {memoized_text}")
+                return memoized_text
+        
+        cache_key = None
+        if self._cache is not None:
+            cache_key = ResponseCache.make_key(
+                data['model'], data['temperature'], json.dumps(data['messages'])
+            )
+            cached_text = self._cache.get(cache_key)
+            if cached_text:
+                logger.info(f"Using cached tweet: {cached_text}")
+                return cached_text
+        
+        if self._semantic_cache is not None:
+            similar_text = self._semantic_cache.lookup(content_idea['Idea'])
+            if similar_text:
+                logger.info(f"Using semantically cached tweet: {similar_text}")
+                return similar_text
+        
+        try:
+            text, truncated = await self._openai.stream_completion(data)
+            
+            # Ensure tweet is within Twitter's character limit
+            generated_text = fit_tweet(text.strip(), truncated)
+            if not generated_text:
+                # Never cache or memoize an empty tweet: it would be replayed as a failure
+                logger.error("OpenAI returned an empty tweet")
+                return None
+            
+            if cache_key is not None and (
+                data['temperature'] <= CACHE_MAX_TEMPERATURE or self._force_cache
+            ):
+                self._cache.put(cache_key, generated_text)
+            
+            if self._semantic_cache is not None:
+                self._semantic_cache.add(content_idea['Idea'], generated_text)
+            
+            if memo_key is not None:
+                self._daily_memo.put(*memo_key, generated_text)
+            
+            logger.info(f"Generated tweet: {generated_text}")
+            return generated_text
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"OpenAI API request failed: {e}")
+            return None
+        except CompletionError as e:
+            logger.error(f"OpenAI returned no tweet: {e}")
+            return None
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"Error parsing OpenAI response: {e}")
+            return None
+    
+    def check_platform(self, content_idea: Dict[str, str]) -> bool:
+        """
+        Check if the platform is Twitter (replicates IF node).
+        Returns True if platform equals "Twitter".
+        """
+        platform = content_idea.get('_platform_lc')
+        if platform is None:
+            platform = content_idea.get('Platform', '').lower()
+        is_twitter = platform in self._ALLOWED_PLATFORMS
+        logger.info(f"Platform check - Is Twitter: {is_twitter}")
+        return is_twitter
@@ -5,10 +5,16 @@ This demonstrates the workflow without requiring actual API keys
 """
 
 import json
+import functools
+import itertools
 import logging
 import random
+import sys
 from datetime import datetime
-from typing import Dict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
 
 # Configure logging
 logging.basicConfig(
@@ -17,46 +23,78 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Shared content ideas pools, kept next to this script
+IDEAS_FILE = Path(__file__).with_name('content_ideas.json')
+
+# Simulated tweets for each demo idea, built once at import. Keys are interned,
+# like the idea strings loaded in _load_ideas, so lookups hit on identity.
+DEMO_TWEETS = {sys.intern(idea): tweet for idea, tweet in {
+    "Latest trends in artificial intelligence and machine learning":
+        "🤖 AI is reshaping how we work and live! From GPT models to computer vision, machine learning continues to break new ground. What AI trend excites you most? #AI #MachineLearning #Tech",
+
+    "Tips for productivity and time management":
+        "⏰ Productivity tip: Try the 2-minute rule - if a task takes less than 2 minutes, do it immediately instead of adding it to your to-do list. Small actions compound into big results! #Productivity #TimeManagement",
+
+    "Interesting facts about technology and innovation":
+        "💡 Did you know? The first computer bug was an actual bug - a moth trapped in a Harvard computer in 1947! Grace Hopper coined the term when she found it. #TechHistory #Innovation #Programming",
+
+    "Motivational quotes for entrepreneurs and creators":
+        "🚀 'The way to get started is to quit talking and begin doing.' - Walt Disney. Every great creation started with someone taking that first step. What are you building today? #Motivation #Entrepreneurship",
+
+    "Behind-the-scenes insights from the tech industry":
+        "🔍 Behind the scenes: Most successful startups pivot at least once. Twitter started as a podcast platform, Instagram was a check-in app. Sometimes the best ideas come from unexpected directions! #Startup #TechInsights"
+}.items()}
+
 class DemoTwitterBot:
-    def __init__(self):
-        """Initialize the demo Twitter bot."""
+    # Fixed attribute layout: no per-instance __dict__
+    __slots__ = ('content_ideas', '_cum', '_rng')
+    
+    # Lowercased platform names the workflow posts to
+    _ALLOWED_PLATFORMS = frozenset({'twitter'})
+    
+    @classmethod
+    @functools.cache
+    def _load_ideas(cls) -> List[Dict[str, str]]:
+        """
+        Load the "basic" ideas pool from content_ideas.json, once per process.
+        Only ideas with a simulated tweet in DEMO_TWEETS are kept.
+        """
+        ideas = [idea for idea in orjson.loads(IDEAS_FILE.read_bytes())['basic']
+                 if idea['Idea'] in DEMO_TWEETS]
+        # Lowercase each platform once here instead of on every check
+        for idea in ideas:
+            idea['_platform_lc'] = idea['Platform'].lower()
+            idea['Idea'] = sys.intern(idea['Idea'])
+        return ideas
+    
+    def __init__(self, weights: Optional[List[float]] = None, seed: Optional[int] = None):
+        """
+        Initialize the demo Twitter bot.
+        
+        Args:
+            weights: Optional selection weight for each content idea (uniform by default).
+            seed: Optional seed for reproducible idea selection.
+        """
         # Content ideas pool (replaces Google Sheets functionality)
-        self.content_ideas = [
-            {"Platform": "Twitter", "Idea": "Latest trends in artificial intelligence and machine learning"},
-            {"Platform": "Twitter", "Idea": "Tips for productivity and time management"},
-            {"Platform": "Twitter", "Idea": "Interesting facts about technology and innovation"},
-            {"Platform": "Twitter", "Idea": "Motivational quotes for entrepreneurs and creators"},
-            {"Platform": "Twitter", "Idea": "Behind-the-scenes insights from the tech industry"}
-        ]
+        self.content_ideas = self._load_ideas()
+        
+        # Cumulative selection weights, built once so each pick is a single bisect
+        weights = weights or [1] * len(self.content_ideas)
+        if len(weights) != len(self.content_ideas):
+            raise ValueError("weights must have one entry per content idea")
+        self._cum = list(itertools.accumulate(weights))
+        self._rng = random.Random(seed)
     
     def get_content_idea(self) -> Dict[str, str]:
         """Get a random content idea (replaces Google Sheets node)."""
-        idea = random.choice(self.content_ideas)
+        idea = self._rng.choices(self.content_ideas, cum_weights=self._cum, k=1)[0]
         logger.info(f"✅ Selected content idea: {idea['Idea']}")
         return idea
     
     def generate_post_with_openai_demo(self, content_idea: Dict[str, str]) -> str:
         """Demo version of OpenAI post generation."""
-        # Simulate different generated tweets based on the idea
-        demo_tweets = {
-            "Latest trends in artificial intelligence and machine learning": 
-                "🤖 AI is reshaping how we work and live! From GPT models to computer vision, machine learning continues to break new ground. What AI trend excites you most? #AI #MachineLearning #Tech",
-            
-            "Tips for productivity and time management":
-                "⏰ Productivity tip: Try the 2-minute rule - if a task takes less than 2 minutes, do it immediately instead of adding it to your to-do list. Small actions compound into big results! #Productivity #TimeManagement",
-            
-            "Interesting facts about technology and innovation":
-                "💡 Did you know? The first computer bug was an actual bug - a moth trapped in a Harvard computer in 1947! Grace Hopper coined the term when she found it. #TechHistory #Innovation #Programming",
-            
-            "Motivational quotes for entrepreneurs and creators":
-                "🚀 'The way to get started is to quit talking and begin doing.' - Walt Disney. Every great creation started with someone taking that first step. What are you building today? #Motivation #Entrepreneurship",
-            
-            "Behind-the-scenes insights from the tech industry":
-                "🔍 Behind the scenes: Most successful startups pivot at least once. Twitter started as a podcast platform, Instagram was a check-in app. Sometimes the best ideas come from unexpected directions! #Startup #TechInsights"
-        }
-        
         # Get the demo tweet for this idea, or generate a generic one
-        tweet_text = demo_tweets.get(content_idea['Idea'], 
+        tweet_text = DEMO_TWEETS.get(content_idea['Idea'], 
             f"Exploring {content_idea['Idea'].lower()} - always fascinating to see how technology evolves! #Tech #Innovation")
         
         logger.info(f"✅ Generated tweet: {tweet_text}")
@@ -64,7 +102,10 @@ class DemoTwitterBot:
     
     def check_platform(self, content_idea: Dict[str, str]) -> bool:
         """Check if the platform is Twitter (replicates IF node)."""
-        is_twitter = content_idea.get('Platform', '').lower() == 'twitter'
+        platform = content_idea.get('_platform_lc')
+        if platform is None:
+            platform = content_idea.get('Platform', '').lower()
+        is_twitter = platform in self._ALLOWED_PLATFORMS
         logger.info(f"✅ Platform check - Is Twitter: {is_twitter}")
         return is_twitter
     
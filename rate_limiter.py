@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiter for concurrent OpenAI requests.
+Tracks requests-per-minute and tokens-per-minute budgets, refilling both
+continuously so bursts never exceed the account's limits.
+"""
+
+import asyncio
+import time
+
+# OpenAI tier-1 limits for gpt-4
+DEFAULT_RPM = 500
+DEFAULT_TPM = 10000
+
+class RateLimiter:
+    def __init__(self, rpm: int = DEFAULT_RPM, tpm: int = DEFAULT_TPM):
+        """Start with full request and token buckets."""
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """Top up both buckets in proportion to the time since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int):
+        """Wait until one request and the given number of tokens are available."""
+        # A request larger than the whole bucket would otherwise wait forever
+        tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (tokens - self._tokens) * 60 / self.tpm
+                )
+                await asyncio.sleep(wait)
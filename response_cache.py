@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Exact-match cache for OpenAI responses.
+Responses are stored in a local SQLite file keyed by (model, temperature, prompt),
+so repeated content ideas can be served without another API call.
+DailyMemo keeps the tweet generated for each idea per UTC day in the same file,
+so a retried run on the same day does not pay for the tweet again.
+BatchQueue carries Batch API jobs, and the tweets they return, between runs.
+"""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Responses sampled above this temperature vary too much to be worth reusing,
+# so they are only written to the cache when explicitly forced.
+CACHE_MAX_TEMPERATURE = 0.3
+
+class ResponseCache:
+    def __init__(self, path: str = '_cache.sqlite'):
+        """Open (or create) the SQLite cache at the given path."""
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+        )
+        self._conn.commit()
+
+        # In-memory hot path in front of the SQLite lookup
+        self.get = functools.lru_cache(maxsize=256)(self._lookup)
+
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str) -> str:
+        """Build the cache key for a request."""
+        return hashlib.blake2b(
+            f"{model}|{temperature}|{prompt}".encode(), digest_size=16
+        ).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[str]:
+        """Return the cached response for a key, or None on a miss."""
+        row = self._conn.execute(
+            "SELECT response FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str):
+        """Store a response, replacing any previous entry for the key."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+            (key, response, int(time.time()))
+        )
+        self._conn.commit()
+        # Drop memoized misses so the new entry is visible
+        self.get.cache_clear()
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        self._conn.close()
+
+class DailyMemo:
+    def __init__(self, path: str = '_cache.sqlite'):
+        """Open (or create) the per-day tweet memo in the SQLite cache file."""
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS posts "
+            "(idea_hash TEXT, day TEXT, text TEXT, posted INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (idea_hash, day))"
+        )
+        # Cache files saved before the posted flag existed lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(posts)")}
+        if 'posted' not in columns:
+            self._conn.execute("ALTER TABLE posts ADD COLUMN posted INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    @staticmethod
+    def idea_hash(idea: str) -> str:
+        """Stable hash of an idea (the builtin hash() changes between runs)."""
+        return hashlib.blake2b(idea.encode(), digest_size=16).hexdigest()
+
+    def get(self, idea_hash: str, day: str) -> Optional[str]:
+        """Return the tweet generated for an idea on a given day, if any."""
+        row = self._conn.execute(
+            "SELECT text FROM posts WHERE idea_hash = ? AND day = ? LIMIT 1",
+            (idea_hash, day)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, idea_hash: str, day: str, text: str):
+        """Remember the tweet generated for an idea on a given day."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO posts (idea_hash, day, text) VALUES (?, ?, ?)",
+            (idea_hash, day, text)
+        )
+        self._conn.commit()
+
+    def is_posted(self, idea_hash: str, day: str) -> bool:
+        """Return True if the tweet for an idea was already posted on a given day."""
+        row = self._conn.execute(
+            "SELECT posted FROM posts WHERE idea_hash = ? AND day = ? LIMIT 1",
+            (idea_hash, day)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def mark_posted(self, idea_hash: str, day: str, text: str):
+        """Record that the tweet for an idea was posted on a given day."""
+        self._conn.execute(
+            "INSERT INTO posts (idea_hash, day, text, posted) VALUES (?, ?, ?, 1) "
+            "ON CONFLICT (idea_hash, day) DO UPDATE SET posted = 1",
+            (idea_hash, day, text)
+        )
+        self._conn.commit()
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        self._conn.close()
+
+class BatchQueue:
+    def __init__(self, path: str = '_cache.sqlite'):
+        """
+        Open (or create) the Batch API queue in the SQLite cache file.
+        Submitted batches wait in `batches` until a later run collects them,
+        and their tweets wait in `scheduled` until they are posted one by one.
+        """
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS batches "
+            "(batch_id TEXT PRIMARY KEY, ideas TEXT, ts INTEGER)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scheduled "
+            "(id INTEGER PRIMARY KEY AUTOINCREMENT, text TEXT, ts INTEGER)"
+        )
+        self._conn.commit()
+
+    def add_batch(self, batch_id: str, ideas: List[Dict[str, str]]):
+        """Remember a submitted batch and the ideas it was built from, in order."""
+        self._conn.execute(
+            "INSERT OR REPLACE INTO batches (batch_id, ideas, ts) VALUES (?, ?, ?)",
+            (batch_id, json.dumps(ideas), int(time.time()))
+        )
+        self._conn.commit()
+
+    def pending_batches(self) -> List[Tuple[str, List[Dict[str, str]]]]:
+        """Return (batch id, ideas) for every batch not yet collected, oldest first."""
+        rows = self._conn.execute(
+            "SELECT batch_id, ideas FROM batches ORDER BY ts"
+        ).fetchall()
+        return [(batch_id, json.loads(ideas)) for batch_id, ideas in rows]
+
+    def _insert_scheduled(self, tweets: List[str]):
+        """Append tweets to the posting queue, in order (the caller commits)."""
+        now = int(time.time())
+        self._conn.executemany(
+            "INSERT INTO scheduled (text, ts) VALUES (?, ?)",
+            [(text, now) for text in tweets]
+        )
+
+    def schedule(self, tweets: List[str]):
+        """Queue tweets to be posted one per --batch-collect run."""
+        with self._conn:
+            self._insert_scheduled(tweets)
+
+    def finish_batch(self, batch_id: str, tweets: List[str]):
+        """Drop a collected batch and queue its tweets, in one transaction."""
+        with self._conn:
+            self._conn.execute("DELETE FROM batches WHERE batch_id = ?", (batch_id,))
+            self._insert_scheduled(tweets)
+
+    def next_scheduled(self) -> Optional[Tuple[int, str]]:
+        """Return (row id, text) of the oldest queued tweet, or None if the queue is empty."""
+        return self._conn.execute(
+            "SELECT id, text FROM scheduled ORDER BY id LIMIT 1"
+        ).fetchone()
+
+    def remove_scheduled(self, row_id: int):
+        """Drop a queued tweet once it has been posted."""
+        self._conn.execute("DELETE FROM scheduled WHERE id = ?", (row_id,))
+        self._conn.commit()
+
+    def close(self):
+        """Close the underlying SQLite connection."""
+        self._conn.close()
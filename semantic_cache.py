@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Semantic cache for generated tweets.
+Content ideas are embedded with a small sentence-transformers model and the
+tweet generated for an idea is reused when a new idea is close enough to it.
+
+Optional: requires `pip install sentence-transformers` and is enabled with
+SEMANTIC_CACHE=true. SEMANTIC_CACHE_THRESHOLD and SEMANTIC_CACHE_TTL (seconds)
+tune the similarity cut-off and how long entries stay valid.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    SentenceTransformer = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 7 * 24 * 60 * 60  # one week
+
+class SemanticCache:
+    def __init__(self, path: str = '_semantic_cache.npz',
+                 threshold: float = DEFAULT_THRESHOLD, ttl: int = DEFAULT_TTL,
+                 model_name: str = 'all-MiniLM-L6-v2'):
+        """Load the embedding model and any cached (embedding, tweet) pairs."""
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self._model = SentenceTransformer(model_name)
+        self._idea_embeds: Dict[str, "np.ndarray"] = {}
+
+        if os.path.exists(path):
+            with np.load(path) as cached:
+                self._embeds = cached['embeds']
+                self._tweets = cached['tweets']
+                self._timestamps = cached['timestamps']
+                # Files written before ideas were stored cannot be matched by idea
+                if 'ideas' in cached.files:
+                    self._ideas = cached['ideas']
+                else:
+                    self._ideas = np.full(len(self._tweets), '', dtype=str)
+        else:
+            dim = self._model.get_sentence_embedding_dimension()
+            self._embeds = np.empty((0, dim), dtype=np.float32)
+            self._ideas = np.empty(0, dtype=str)
+            self._tweets = np.empty(0, dtype=str)
+            self._timestamps = np.empty(0, dtype=np.float64)
+
+    def precompute(self, ideas: List[str]):
+        """Embed a pool of ideas in one batch so later lookups skip the model."""
+        missing = [idea for idea in ideas if idea not in self._idea_embeds]
+        if missing:
+            embeds = self._model.encode(missing, normalize_embeddings=True)
+            self._idea_embeds.update(zip(missing, embeds))
+
+    def embed_idea(self, idea: str) -> "np.ndarray":
+        """Return the normalized embedding for an idea."""
+        if idea not in self._idea_embeds:
+            self.precompute([idea])
+        return self._idea_embeds[idea]
+
+    def lookup(self, idea: str) -> Optional[str]:
+        """Return the cached tweet for the most similar idea, if close enough."""
+        if not len(self._tweets):
+            return None
+
+        fresh = self._timestamps >= time.time() - self.ttl
+        if not fresh.any():
+            return None
+
+        sims = self._embeds[fresh] @ self.embed_idea(idea)
+        best = int(sims.argmax())
+        if sims[best] < self.threshold:
+            return None
+
+        logger.info(f"Semantic cache hit (similarity {sims[best]:.3f})")
+        return str(self._tweets[fresh][best])
+
+    def add(self, idea: str, tweet: str):
+        """
+        Cache the tweet generated for an idea and persist the cache.
+        Expired entries and any older tweet for the same idea are dropped
+        first, so the file tracks the live ideas instead of every generation.
+        """
+        keep = (self._timestamps >= time.time() - self.ttl) & (self._ideas != idea)
+        self._embeds = np.vstack([self._embeds[keep], self.embed_idea(idea)[np.newaxis, :]])
+        self._ideas = np.append(self._ideas[keep], idea)
+        self._tweets = np.append(self._tweets[keep], tweet)
+        self._timestamps = np.append(self._timestamps[keep], time.time())
+        np.savez(self.path, embeds=self._embeds, ideas=self._ideas, tweets=self._tweets,
+                 timestamps=self._timestamps)
+
+def semantic_cache_from_env() -> Optional[SemanticCache]:
+    """Create a SemanticCache if SEMANTIC_CACHE=true and the model is available."""
+    if os.getenv('SEMANTIC_CACHE', 'false').lower() != 'true':
+        return None
+    if SentenceTransformer is None:
+        logger.warning("SEMANTIC_CACHE is set but sentence-transformers is not installed")
+        return None
+    return SemanticCache(
+        threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', DEFAULT_THRESHOLD)),
+        ttl=int(os.getenv('SEMANTIC_CACHE_TTL', DEFAULT_TTL))
+    )
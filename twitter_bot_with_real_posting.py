@@ -5,61 +5,27 @@ This version demonstrates how to integrate with actual Twitter posting functiona
 """
 
 import os
-import json
+import asyncio
 import logging
-import random
-from datetime import datetime
-from typing import List, Dict, Optional
-import requests
+from typing import Dict
+import orjson
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('twitter_bot.log'),
-        logging.StreamHandler()
-    ]
-)
+from bot_common import LOG_FILE, TWEET_MAX_TOKENS, ContentBot, setup_logging
+
+setup_logging()
 logger = logging.getLogger(__name__)
 
-class TwitterBotWithRealPosting:
-    def __init__(self):
-        """Initialize the Twitter bot with API credentials."""
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        
-        if not self.openai_api_key:
-            raise ValueError("OPENAI_API_KEY environment variable is required")
-        
-        # Enhanced content ideas with more variety and engagement
-        self.content_ideas = [
-            {"Platform": "Twitter", "Idea": "Share a quick tip about AI and machine learning that beginners can understand"},
-            {"Platform": "Twitter", "Idea": "Discuss the latest breakthrough in technology and its potential impact"},
-            {"Platform": "Twitter", "Idea": "Motivational message for developers and creators working on their projects"},
-            {"Platform": "Twitter", "Idea": "Interesting fact about the history of computing or the internet"},
-            {"Platform": "Twitter", "Idea": "Quick productivity hack that can save time in daily work"},
-            {"Platform": "Twitter", "Idea": "Thought-provoking question about the future of technology"},
-            {"Platform": "Twitter", "Idea": "Behind-the-scenes insight from the tech industry or startup world"},
-            {"Platform": "Twitter", "Idea": "Simple explanation of a complex technical concept"},
-            {"Platform": "Twitter", "Idea": "Inspirational story about innovation or problem-solving"},
-            {"Platform": "Twitter", "Idea": "Trend analysis or prediction about emerging technologies"},
-            {"Platform": "Twitter", "Idea": "Personal growth tip related to learning and skill development"},
-            {"Platform": "Twitter", "Idea": "Fun fact about programming languages or software development"},
-            {"Platform": "Twitter", "Idea": "Career advice for people in tech or aspiring to join tech"},
-            {"Platform": "Twitter", "Idea": "Discussion about work-life balance in the digital age"},
-            {"Platform": "Twitter", "Idea": "Highlight an underrated tool or resource for creators"}
-        ]
+class TwitterBotWithRealPosting(ContentBot):
+    __slots__ = ()
     
-    def get_content_idea(self) -> Dict[str, str]:
-        """Get a random content idea with enhanced variety."""
-        idea = random.choice(self.content_ideas)
-        logger.info(f"Selected content idea: {idea['Idea']}")
-        return idea
+    _IDEAS_POOL = 'enhanced'
     
-    def generate_post_with_openai(self, content_idea: Dict[str, str]) -> Optional[str]:
-        """Generate an engaging social media post using OpenAI."""
-        # Enhanced prompt for better engagement
-        prompt = f"""Create an engaging and concise social media post for {content_idea['Platform']} based on this idea: {content_idea['Idea']}. 
+    # Static instructions sent ahead of every idea. Keeping them as an
+    # unchanging prefix lets OpenAI's prompt cache reuse them across calls,
+    # so nothing per-call (timestamps, ids, the idea itself) belongs here.
+    _SYSTEM_PREFIX = """You are a social media expert who creates engaging, authentic content that provides value to the audience.
+
+Create an engaging and concise social media post for the platform based on the idea given.
 
 Guidelines:
 - Keep it under 280 characters
@@ -68,59 +34,27 @@ Guidelines:
 - Use emojis sparingly but effectively
 - Encourage interaction when possible
 - Be authentic and valuable to the audience"""
+    
+    def _build_request(self, content_idea: Dict[str, str]) -> Dict:
+        """Build the chat completions request body for a content idea."""
+        # Only the idea varies between calls, so it goes last
+        prompt = f"Platform: {content_idea['Platform']}\nIdea: {content_idea['Idea']}"
         
-        headers = {
-            'Authorization': f'Bearer {self.openai_api_key}',
-            'Content-Type': 'application/json'
-        }
-        
-        data = {
+        return {
             'model': 'gpt-4',
             'messages': [
                 {
                     'role': 'system',
-                    'content': 'You are a social media expert who creates engaging, authentic content that provides value to the audience.'
+                    'content': self._SYSTEM_PREFIX
                 },
                 {
                     'role': 'user',
                     'content': prompt
                 }
             ],
-            'max_tokens': 100,
+            'max_tokens': TWEET_MAX_TOKENS,
             'temperature': 0.8
         }
-        
-        try:
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
-                headers=headers,
-                json=data,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            generated_text = result['choices'][0]['message']['content'].strip()
-            
-            # Ensure tweet is within Twitter's character limit
-            if len(generated_text) > 280:
-                generated_text = generated_text[:277] + "..."
-            
-            logger.info(f"Generated tweet: {generated_text}")
-            return generated_text
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"OpenAI API request failed: {e}")
-            return None
-        except (KeyError, IndexError) as e:
-            logger.error(f"Error parsing OpenAI response: {e}")
-            return None
-    
-    def check_platform(self, content_idea: Dict[str, str]) -> bool:
-        """Check if the platform is Twitter."""
-        is_twitter = content_idea.get('Platform', '').lower() == 'twitter'
-        logger.info(f"Platform check - Is Twitter: {is_twitter}")
-        return is_twitter
     
     def post_to_twitter_real(self, tweet_text: str) -> bool:
         """
@@ -174,7 +108,7 @@ Guidelines:
         log_entry = {
             "status": status,
             "text": tweet_text,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self._clock.now(),
             "platform": "Twitter",
             "character_count": len(tweet_text)
         }
@@ -184,26 +118,17 @@ Guidelines:
         if tweet_url:
             log_entry["tweet_url"] = tweet_url
         
-        # Append to JSON log file
-        log_file = 'posted_tweets.json'
+        # Append one JSON line; earlier entries are never re-read or rewritten
         try:
-            if os.path.exists(log_file):
-                with open(log_file, 'r') as f:
-                    logs = json.load(f)
-            else:
-                logs = []
-            
-            logs.append(log_entry)
-            
-            with open(log_file, 'w') as f:
-                json.dump(logs, f, indent=2)
+            with open(LOG_FILE, 'ab') as f:
+                f.write(orjson.dumps(log_entry) + b'\n')
             
             logger.info(f"Updated log with new tweet entry")
             
         except Exception as e:
             logger.error(f"Failed to update log: {e}")
     
-    def run_workflow(self, use_real_posting: bool = False):
+    async def run_workflow(self, use_real_posting: bool = False):
         """
         Execute the complete workflow.
         
@@ -217,7 +142,7 @@ Guidelines:
             content_idea = self.get_content_idea()
             
             # Step 2: Generate Post with OpenAI
-            tweet_text = self.generate_post_with_openai(content_idea)
+            tweet_text = await self.generate_post_with_openai(content_idea)
             if not tweet_text:
                 logger.error("Failed to generate tweet text")
                 return False
@@ -227,6 +152,11 @@ Guidelines:
                 logger.info("Platform is not Twitter, skipping post")
                 return False
             
+            # A re-run on the same day must not post the tweet twice
+            if self.already_posted(content_idea):
+                logger.info("Today's tweet for this idea was already posted, skipping post")
+                return True
+            
             # Step 4: Post to Twitter (real or simulated)
             if use_real_posting:
                 success = self.post_to_twitter_real(tweet_text)
@@ -236,6 +166,7 @@ Guidelines:
             if not success:
                 logger.error("Failed to post tweet")
                 return False
+            self.mark_posted(content_idea, tweet_text)
             
             logger.info("Workflow completed successfully!")
             return True
@@ -244,14 +175,21 @@ Guidelines:
             logger.error(f"Workflow failed with error: {e}")
             return False
 
+async def run_bot(bot: TwitterBotWithRealPosting, use_real_posting: bool = False) -> bool:
+    """Run the workflow once and release the bot's HTTP session afterwards."""
+    async with bot:
+        return await bot.run_workflow(use_real_posting=use_real_posting)
+
 def main():
     """Main function to run the enhanced Twitter content bot."""
     try:
         # Check environment variables for posting mode
         use_real_posting = os.getenv('USE_REAL_POSTING', 'false').lower() == 'true'
+        use_cache = os.getenv('NO_CACHE', 'false').lower() != 'true'
+        force_cache = os.getenv('FORCE_CACHE', 'false').lower() == 'true'
         
-        bot = TwitterBotWithRealPosting()
-        success = bot.run_workflow(use_real_posting=use_real_posting)
+        bot = TwitterBotWithRealPosting(use_cache=use_cache, force_cache=force_cache)
+        success = asyncio.run(run_bot(bot, use_real_posting))
         
         if success:
             mode = "real posting" if use_real_posting else "simulation"